@@ -23,7 +23,7 @@ from atomdb.promolecule import Promolecule
 
 from atomdb.periodic import element_number, element_symbol, element_name
 
-from atomdb.species import compile, load, dump, raw_datafile
+from atomdb.species import compile, compile_many, load, dump, raw_datafile
 
 from atomdb.promolecule import make_promolecule
 
@@ -38,6 +38,7 @@ __all__ = [
     "element_symbol",
     "element_name",
     "compile",
+    "compile_many",
     "load",
     "dump",
     "raw_datafile",
@@ -21,9 +21,6 @@ from iodata import load_one
 
 from gbasis.wrappers import from_iodata
 
-from gbasis.evals.density import evaluate_density as eval_dens
-from gbasis.evals.density import evaluate_deriv_density as eval_d_dens
-from gbasis.evals.density import evaluate_posdef_kinetic_energy_density as eval_pd_ked
 from gbasis.evals.density import evaluate_basis
 from gbasis.evals.eval_deriv import evaluate_deriv_basis
 
@@ -32,6 +29,7 @@ from grid.rtransform import ExpRTransform
 from grid.atomgrid import AtomGrid
 
 import atomdb
+from atomdb.periodic import Element
 
 
 __all__ = [
@@ -50,6 +48,15 @@ SIZE = 170  # Lebedev grid sizes
 
 DEGREE = 21  #  Lebedev grid degrees
 
+TOL_OCC = 1e-10  # natural orbitals with smaller occupation magnitude are dropped
+
+DTYPE = np.float32  # storage precision of the density and KED arrays (the grid stays float64)
+
+# The grid only depends on the parameters above, so build it once per process
+RGRID = ExpRTransform(*BOUND).transform_1d_grid(UniformInteger(NPOINTS))  # radial grid
+
+ATGRID = AtomGrid(RGRID, degrees=[DEGREE], sizes=[SIZE], center=np.zeros(3))
+
 
 BASIS = "aug-ccpwCVQZ"
 
@@ -61,7 +68,65 @@ Electronic structure and density properties evaluated with aug-ccpwCVQZ basis se
 """
 
 
-def eval_orbs_density(one_density_matrix, orb_eval):
+def natural_orbitals(one_density_matrix, tol_occ=TOL_OCC):
+    r"""Return the significant natural orbitals of a one-electron density matrix
+
+    P = \sum_k n_k U_k U_k^T, keeping only the terms with |n_k| > tol_occ.
+    The 1DM must be symmetric, since ``np.linalg.eigh`` only reads its lower triangle.
+
+    Parameters
+    ----------
+    one_density_matrix : np.ndarray(K_orb, K_orb)
+        Symmetric one-electron density matrix (1DM) from K orbitals
+    tol_occ : float, optional
+        Occupation threshold below which natural orbitals are discarded.
+
+    Returns
+    -------
+    occs : np.ndarray(K_no,)
+        Natural orbital occupations
+    coeffs : np.ndarray(K_orb, K_no)
+        Natural orbital coefficients in the basis of the 1DM
+    """
+    occs, coeffs = np.linalg.eigh(one_density_matrix)
+    mask = np.abs(occs) > tol_occ
+    return occs[mask], coeffs[:, mask]
+
+
+def contract_one_density_matrix(one_density_matrix, orb_eval, natorbs=None):
+    r"""Return the product of the 1DM with a set of orbital values
+
+    \sum_j P_ij \phi_j(r)
+
+    When the natural orbitals are given and fewer than K_orb / 3 of them are kept, the
+    product is formed through them, which costs 2 K_orb K_no N instead of K_orb^2 N.
+    Otherwise the 1DM is applied directly: the two passes over the grid make the
+    natural-orbital route slower already somewhat below K_no = K_orb / 2.
+
+    Parameters
+    ----------
+    one_density_matrix : np.ndarray(K_orb, K_orb)
+        One-electron density matrix (1DM) from K orbitals
+    orb_eval : np.ndarray(K_orb, N)
+        orbitals (or their derivatives) evaluated at a set of grid points (N).
+        These orbitals must be the basis used to evaluate the 1DM.
+    natorbs : tuple of np.ndarray, optional
+        Natural orbital occupations and coefficients of the 1DM,
+        as returned by ``natural_orbitals``.
+
+    Returns
+    -------
+    product : np.ndarray(K_orb, N)
+        1DM applied to the orbitals at a set of grid points (N)
+    """
+    if natorbs is not None:
+        occs, coeffs = natorbs
+        if 3 * occs.size < one_density_matrix.shape[0]:
+            return (coeffs * occs).dot(coeffs.T.dot(orb_eval))
+    return one_density_matrix.dot(orb_eval)
+
+
+def eval_orbs_density(one_density_matrix, orb_eval, natorbs=None):
     r"""Return each orbital density evaluated at a set of points
 
     rho_i(r) = \sum_j P_ij \phi_i(r) \phi_j(r)
@@ -73,6 +138,8 @@ def eval_orbs_density(one_density_matrix, orb_eval):
     orb_eval : np.ndarray(K_orb, N)
         orbitals evaluated at a set of grid points (N).
         These orbitals must be the basis used to evaluate the 1DM.
+    natorbs : tuple of np.ndarray, optional
+        Natural orbitals of the 1DM, as returned by ``natural_orbitals``.
 
     Returns
     -------
@@ -80,23 +147,62 @@ def eval_orbs_density(one_density_matrix, orb_eval):
         orbitals density at a set of grid points (N)
     """
     #
-    # Following lines were taken from Gbasis eval.py module (L60-L61)
+    # Following lines were adapted from Gbasis eval.py module (L60-L61)
     #
-    density = one_density_matrix.dot(orb_eval)
+    density = contract_one_density_matrix(one_density_matrix, orb_eval, natorbs)
     density *= orb_eval
     return density
 
 
-def eval_orb_ked(one_density_matrix, basis, points, transform=None, coord_type="spherical"):
-    "Adapted from Gbasis"
+def eval_orb_deriv(basis, points, transform=None):
+    r"""Return the Cartesian first derivatives of the orbitals at a set of points
+
+    Parameters
+    ----------
+    basis : list of GeneralizedContractionShell
+        Basis set used to evaluate the orbitals.
+    points : np.ndarray(N, 3)
+        Cartesian coordinates of the grid points.
+    transform : np.ndarray(K_orb, K_basis), optional
+        Transformation from the basis functions to the orbitals.
+
+    Returns
+    -------
+    deriv_orb_evals : list of np.ndarray(K_orb, N)
+        x, y and z derivatives of the orbitals at the grid points (N)
+    """
+    return [
+        evaluate_deriv_basis(basis, points, orders, transform=transform)
+        for orders in np.identity(3, dtype=int)
+    ]
+
+
+def eval_orb_ked(one_density_matrix, deriv_orb_evals, natorbs=None):
+    r"""Return each orbital positive-definite kinetic energy density at a set of points
+
+    tau_i(r) = 1/2 \sum_j P_ij \nabla\phi_i(r) \cdot \nabla\phi_j(r)
+
+    Adapted from Gbasis.
+
+    Parameters
+    ----------
+    one_density_matrix : np.ndarray(K_orb, K_orb)
+        One-electron density matrix (1DM) from K orbitals
+    deriv_orb_evals : list of np.ndarray(K_orb, N)
+        x, y and z derivatives of the orbitals at a set of grid points (N),
+        as returned by ``eval_orb_deriv``.
+    natorbs : tuple of np.ndarray, optional
+        Natural orbitals of the 1DM, as returned by ``natural_orbitals``.
+
+    Returns
+    -------
+    orb_ked : np.ndarray(K_orb, N)
+        orbitals kinetic energy density at a set of grid points (N)
+    """
     orbt_ked = 0
-    for orders in np.identity(3, dtype=int):
-        deriv_orb_eval_one = evaluate_deriv_basis(
-            basis, points, orders, transform=transform, coord_type=coord_type
-        )
-        deriv_orb_eval_two = deriv_orb_eval_one  # orders_one == orders_two
-        density = one_density_matrix.dot(deriv_orb_eval_two)
-        density *= deriv_orb_eval_one
+    for deriv_orb_eval in deriv_orb_evals:
+        density = contract_one_density_matrix(one_density_matrix, deriv_orb_eval, natorbs)
+        density *= deriv_orb_eval
         orbt_ked += density
     return 0.5 * orbt_ked
 
@@ -109,15 +215,15 @@ def run(elem, charge, mult, nexc, dataset, datapath):
 
     # Set up internal variables
     elem = atomdb.element_symbol(elem)
-    natom = atomdb.element_number(elem)
-    nelec = natom - charge
+    atnum = atomdb.element_number(elem)
+    nelec = atnum - charge
     nspin = mult - 1
     n_up = (nelec + nspin) // 2
     n_dn = (nelec - nspin) // 2
-    basis = BASIS
+    obasis_name = BASIS
 
     # Load restricted Hartree-Fock SCF
-    scfdata = load_one(atomdb.datafile(".molden", elem, charge, mult, nexc, dataset, datapath))
+    scfdata = load_one(atomdb.raw_datafile(".molden", elem, charge, mult, nexc, dataset, datapath))
     norba = scfdata.mo.norba
     mo_e_up = scfdata.mo.energies[:norba]
     mo_e_dn = mo_e_up  # since only alpha MO information in .molden
@@ -125,40 +231,41 @@ def run(elem, charge, mult, nexc, dataset, datapath):
     occs_dn = None
     mo_coeff = scfdata.mo.coeffs
 
-    # Load HCI data
-    data = np.load(atomdb.datafile(".ci.npz", elem, charge, mult, nexc, dataset, datapath))
-    energy = data["energy"][0]
-
-    # Prepare data for computing Species properties
-    dm1_up, dm1_dn = data["rdm1"]
-    dm1_tot = dm1_up + dm1_dn
-
-    # Make grid
-    onedg = UniformInteger(NPOINTS)  # number of uniform grid points.
-    rgrid = ExpRTransform(*BOUND).transform_1d_grid(onedg)  # radial grid
-    atgrid = AtomGrid(rgrid, degrees=[DEGREE], sizes=[SIZE], center=np.array([0.0, 0.0, 0.0]))
+    # Load HCI data, reading each array from the archive once
+    with np.load(
+        atomdb.raw_datafile(".ci.npz", elem, charge, mult, nexc, dataset, datapath)
+    ) as cidata:
+        energy = cidata["energy"][0]
+        # Prepare data for computing Species properties
+        dm1_up, dm1_dn = cidata["rdm1"]
+    # Symmetrize the 1DMs once, so that the natural-orbital and the direct contractions use
+    # the same matrix (``np.linalg.eigh`` only reads the lower triangle)
+    dm1_up = 0.5 * (dm1_up + dm1_up.T)
+    dm1_dn = 0.5 * (dm1_dn + dm1_dn.T)
+
+    # Get grid
+    rgrid, atgrid = RGRID, ATGRID
 
     # Compute densities
-    obasis, coord_types = from_iodata(scfdata)
-    orb_eval = evaluate_basis(obasis, atgrid.points, coord_type=coord_types, transform=mo_coeff.T)
-    orb_dens_up = eval_orbs_density(dm1_up, orb_eval)
-    orb_dens_dn = eval_orbs_density(dm1_dn, orb_eval)
-    # orb_dens_tot = orb_dens_up + orb_dens_dn
-    # dens_tot = np.sum(orb_dens_tot, axis=0)
-    dens_tot = eval_dens(
-        dm1_tot, obasis, atgrid.points, coord_type=coord_types, transform=mo_coeff.T
-    )
+    # gbasis screens out shells at points where their envelope is negligible (tol_screen=1e-8
+    # by default), which skips most of the diffuse aug-ccpwCVQZ contractions at large r
+    obasis = from_iodata(scfdata)
+    orb_eval = evaluate_basis(obasis, atgrid.points, transform=mo_coeff.T)
+    # Natural orbitals of each spin 1DM, shared by the density and KED contractions
+    natorbs_up = natural_orbitals(dm1_up)
+    natorbs_dn = natural_orbitals(dm1_dn)
+    orb_dens_up = eval_orbs_density(dm1_up, orb_eval, natorbs_up)
+    orb_dens_dn = eval_orbs_density(dm1_dn, orb_eval, natorbs_dn)
+    # The density is linear in the 1DM, so the total density follows from the
+    # spin-resolved orbital densities without another basis evaluation
+    dens_tot = np.sum(orb_dens_up, axis=0) + np.sum(orb_dens_dn, axis=0)
 
     # Compute kinetic energy density
-    orb_ked_up = eval_orb_ked(
-        dm1_up, obasis, atgrid.points, transform=mo_coeff.T, coord_type=coord_types
-    )
-    orb_ked_dn = eval_orb_ked(
-        dm1_dn, obasis, atgrid.points, transform=mo_coeff.T, coord_type=coord_types
-    )
-    ked_tot = eval_pd_ked(
-        dm1_tot, obasis, atgrid.points, coord_type=coord_types, transform=mo_coeff.T
-    )
+    # The orbital gradients are evaluated once and shared by both spin channels
+    deriv_orb_evals = eval_orb_deriv(obasis, atgrid.points, transform=mo_coeff.T)
+    orb_ked_up = eval_orb_ked(dm1_up, deriv_orb_evals, natorbs_up)
+    orb_ked_dn = eval_orb_ked(dm1_dn, deriv_orb_evals, natorbs_dn)
+    ked_tot = np.sum(orb_ked_up, axis=0) + np.sum(orb_ked_dn, axis=0)
 
     # Density and KED spherical average
     dens_spherical_avg = atgrid.spherical_average(dens_tot)
@@ -167,21 +274,28 @@ def run(elem, charge, mult, nexc, dataset, datapath):
     dens_splines_dn = [atgrid.spherical_average(dens) for dens in orb_dens_dn]
     ked_splines_up = [atgrid.spherical_average(dens) for dens in orb_ked_up]
     ked_splines_dn = [atgrid.spherical_average(dens) for dens in orb_ked_dn]
-    # Evaluate interpolated densities in a uniform radial grid
+    # Evaluate interpolated densities in a uniform radial grid, stored in DTYPE precision
     rs = rgrid.points
-    dens_avg_tot = dens_spherical_avg(rs)
-    orb_dens_avg_up = np.array([spline(rs) for spline in dens_splines_up])
-    orb_dens_avg_dn = np.array([spline(rs) for spline in dens_splines_dn])
-    ked_avg_tot = ked_spherical_avg(rs)
-    orb_ked_avg_up = np.array([spline(rs) for spline in ked_splines_up])
-    orb_ked_avg_dn = np.array([spline(rs) for spline in ked_splines_dn])
+    dens_avg_tot = dens_spherical_avg(rs).astype(DTYPE)
+    orb_dens_avg_up = np.array([spline(rs) for spline in dens_splines_up], dtype=DTYPE)
+    orb_dens_avg_dn = np.array([spline(rs) for spline in dens_splines_dn], dtype=DTYPE)
+    ked_avg_tot = ked_spherical_avg(rs).astype(DTYPE)
+    orb_ked_avg_up = np.array([spline(rs) for spline in ked_splines_up], dtype=DTYPE)
+    orb_ked_avg_dn = np.array([spline(rs) for spline in ked_splines_dn], dtype=DTYPE)
 
     #
     # Element properties
     #
-    cov_radii, vdw_radii, mass = atomdb.get_element_data(elem)
-    if charge != 0:
-        cov_radii, vdw_radii = [None, None]  # overwrite values for charged species
+    atom = Element(elem)
+    atmass = atom.mass
+    cov_radius, vdw_radius, at_radius, polarizability, dispersion = [
+        None,
+    ] * 5
+    # overwrite values for neutral atomic species
+    if charge == 0:
+        cov_radius, vdw_radius, at_radius = (atom.cov_radius, atom.vdw_radius, atom.at_radius)
+        polarizability = atom.pold
+        dispersion = {"C6": atom.c6}
     #
     # Conceptual-DFT properties (TODO)
     #
@@ -192,28 +306,33 @@ def run(elem, charge, mult, nexc, dataset, datapath):
     # Return Species instance
     fields = dict(
         elem=elem,
-        natom=natom,
-        basis=basis,
+        atnum=atnum,
+        obasis_name=obasis_name,
         nelec=nelec,
         nspin=nspin,
         nexc=nexc,
-        # cov_radii=cov_radii,
-        # vdw_radii=vdw_radii,
-        # mass=mass,
+        atmass=atmass,
+        cov_radius=cov_radius,
+        vdw_radius=vdw_radius,
+        at_radius=at_radius,
+        polarizability=polarizability,
+        dispersion=dispersion,
         energy=energy,
-        mo_e_up=mo_e_up,
-        mo_e_dn=mo_e_dn,
-        occs_up=occs_up,
-        occs_dn=occs_dn,
+        mo_energy_a=mo_e_up,
+        mo_energy_b=mo_e_dn,
+        mo_occs_a=occs_up,
+        mo_occs_b=occs_dn,
         ip=ip,
         mu=mu,
         eta=eta,
         rs=rs,
-        _orb_dens_up=orb_dens_avg_up.flatten(),
-        _orb_dens_dn=orb_dens_avg_dn.flatten(),
+        # Density
+        mo_dens_a=orb_dens_avg_up.flatten(),
+        mo_dens_b=orb_dens_avg_dn.flatten(),
         dens_tot=dens_avg_tot,
-        _orb_ked_up=orb_ked_avg_up.flatten(),
-        _orb_ked_dn=orb_ked_avg_dn.flatten(),
+        # KED
+        mo_ked_a=orb_ked_avg_up.flatten(),
+        mo_ked_b=orb_ked_avg_dn.flatten(),
         ked_tot=ked_avg_tot,
     )
     return atomdb.Species(dataset, fields)
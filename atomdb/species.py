@@ -15,16 +15,29 @@
 
 r"""AtomDB, a database of atomic and ionic properties."""
 
-from dataclasses import dataclass, field, asdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from dataclasses import dataclass, field, fields, asdict
 
 from glob import glob
 
 from importlib import import_module
 
+from itertools import repeat
+
+import mmap
+
 import json
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from numbers import Integral
 
+from operator import attrgetter
+
 from os import makedirs, path
 
 from msgpack import packb, unpackb
@@ -39,7 +52,7 @@ import pooch
 import re
 import requests
 
-from scipy.interpolate import CubicSpline
+from scipy.interpolate import CubicSpline, PPoly
 
 from atomdb.utils import DEFAULT_DATASET, DEFAULT_DATAPATH, DEFAULT_REMOTE
 from atomdb.periodic import element_symbol
@@ -48,6 +61,7 @@ from atomdb.periodic import element_symbol
 __all__ = [
     "Species",
     "compile",
+    "compile_many",
     "dump",
     "load",
     "raw_datafile",
@@ -76,14 +90,8 @@ def default_matrix():
 
 def scalar(method):
     r"""Expose a SpeciesData field."""
-    name = method.__name__
-
-    @property
-    def wrapper(self):
-        rf"""{method.__doc__}"""
-        return getattr(self._data, name)
-
-    return wrapper
+    # attrgetter does the nested lookup self._data.<name> in C
+    return property(attrgetter(f"_data.{method.__name__}"), doc=method.__doc__)
 
 
 def _remove_suffix(input_string, suffix):
@@ -92,10 +100,44 @@ def _remove_suffix(input_string, suffix):
     return input_string
 
 
+def _spline_key(name, spin, index, log):
+    r"""Return the spline cache key for a call, or ``None`` if it should not be cached.
+
+    Orbital indices are keyed by dtype, shape and contents, so that a boolean mask and an
+    integer sequence with equal values are told apart. Indices that are not integer or boolean
+    arrays (e.g. slices) are not cached.
+    """
+    if index is None:
+        return (name, spin, None, log)
+    try:
+        index = np.asarray(index)
+    except (TypeError, ValueError):
+        return None
+    if index.dtype.kind not in "biu":
+        return None
+    return (name, spin, (index.dtype.str, index.shape, index.tobytes()), log)
+
+
 def spline(method):
     r"""Expose a SpeciesData field via the ``DensitySpline`` interface."""
     name = _remove_suffix(method.__name__, "_func")
 
+    # Resolve once, for each spin polarization direction, which {a,b,tot} arrays each `spin`
+    # combines and how, instead of rebuilding the field names on every call
+    name_tot = f"{name}_tot"
+    resolve = {
+        spinpol: {
+            "t": (np.add, name_a, name_b),
+            "a": (None, name_a),
+            "b": (None, name_b),
+            "m": (np.subtract, name_a, name_b),
+        }
+        for spinpol, (name_a, name_b) in (
+            (1, (f"mo_{name}_a", f"mo_{name}_b")),
+            (-1, (f"mo_{name}_b", f"mo_{name}_a")),
+        )
+    }
+
     def wrapper(self, spin="t", index=None, log=False):
         rf"""{method.__doc__}"""
         # Validate `spin` variable
@@ -104,29 +146,20 @@ def spline(method):
                 f"Invalid `spin` parameter '{spin}'; " "choose one of ('t'| 'a' | 'b' | 'm')"
             )
 
-        # Set names for {a,b,tot} arrays
-        name_tot = f"{name}_tot"
-        if self.spinpol == 1:
-            name_a, name_b = f"mo_{name}_a", f"mo_{name}_b"
-        else:
-            name_a, name_b = f"mo_{name}_b", f"mo_{name}_a"
+        # Return the cached spline if it was already built
+        key = _spline_key(method.__name__, spin, index, log)
+        if key in self._spline_cache:
+            return self._spline_cache[key]
 
         # Extract arrays
         if index is None and spin == "t":
             arr = getattr(self._data, name_tot)
-        elif spin == "t":
-            arr = getattr(self._data, name_a) + getattr(self._data, name_b)
+        else:
+            op, *names = resolve[self._spinpol][spin]
+            arrs = [getattr(self._data, n) for n in names]
+            arr = arrs[0] if op is None else op(*arrs)
             # FIXME: This is a hack to change the array to the correct 2D shape
             arr = arr.reshape(self.ao.nbasis, -1)
-        elif spin == "a":
-            arr = getattr(self._data, name_a)
-            arr = arr.reshape(self.ao.nbasis, -1)
-        elif spin == "b":
-            arr = getattr(self._data, name_b)
-            arr = arr.reshape(self.ao.nbasis, -1)
-        elif spin == "m":
-            arr = getattr(self._data, name_a) - getattr(self._data, name_b)
-            arr = arr.reshape(self.ao.nbasis, -1)
         # Select specific orbitals
         if index is not None:
             arr = arr[index]
@@ -134,18 +167,30 @@ def spline(method):
         if arr.ndim > 1:
             arr = arr.sum(axis=0)  # (N,)
 
-        # Return cubic spline
-        return DensitySpline(self._data.rs, arr, log=log)
+        # Build and cache cubic spline
+        obj = DensitySpline(self._data.rs, arr, log=log)
+        if key is not None:
+            self._spline_cache[key] = obj
+        return obj
 
     return wrapper
 
 
 class DensitySpline:
-    r"""Interpolate density using a cubic spline over a 1-D grid."""
+    r"""Interpolate density using a cubic spline over a 1-D grid.
+
+    The knots and values are converted to float64 before the spline is built, and evaluations are
+    always returned in float64. Datasets that store their density arrays in float32 (about 7
+    significant digits) halve their size at the cost of the stored precision only; derivatives
+    amplify that rounding, to roughly 1e-6 relative error for the first derivative and 1e-4 for
+    the second.
+
+    """
 
     def __init__(self, x, y, log=False):
         r"""Initialize the CubicSpline instance."""
         self._log = log
+        y = np.asarray(y, dtype=float)
         self._obj = CubicSpline(
             x,
             np.log(y) if log else y,
@@ -153,6 +198,37 @@ class DensitySpline:
             bc_type="not-a-knot",
             extrapolate=True,
         )
+        if log:
+            # Stack the coefficients of log(ρ) and of its first and second derivatives along a
+            # trailing axis, so a single PPoly evaluation finds each point's interval once
+            c = self._obj.c
+            zero = np.zeros_like(c[0])
+            dc1 = [zero, 3 * c[0], 2 * c[1], c[2]]
+            dc2 = [zero, zero, 6 * c[0], 2 * c[1]]
+            dc = np.stack([c, dc1, dc2], axis=-1)
+            self._dlog = {
+                1: PPoly(np.ascontiguousarray(dc[..., :2]), self._obj.x, extrapolate=True),
+                2: PPoly(dc, self._obj.x, extrapolate=True),
+            }
+
+    def _eval_all(self, x, deriv):
+        r"""
+        Evaluate log(ρ) and its derivatives up to order `deriv` in one pass.
+
+        Parameters
+        ----------
+        x: ndarray(M,)
+            Points to be interpolated.
+        deriv: int
+            Highest derivative order to evaluate. Must be 1 or 2.
+
+        Returns
+        -------
+        tuple of ndarray(M,)
+            log(ρ) followed by its derivatives of order 1 to `deriv`.
+
+        """
+        return tuple(self._dlog[deriv](np.asarray(x, dtype=float).ravel()).T)
 
     def __call__(self, x, deriv=0):
         r"""
@@ -174,16 +250,17 @@ class DensitySpline:
         if not (0 <= deriv <= 2):
             raise ValueError(f"Invalid derivative order {deriv}; must be 0 <= `deriv` <= 2")
         elif self._log:
-            y = np.exp(self._obj(x))
-            if deriv == 1:
+            if deriv == 0:
+                y = np.exp(self._obj(x))
+            elif deriv == 1:
                 # d(ρ(r)) = d(log(ρ(r))) * ρ(r)
-                dlogy = self._obj(x, nu=1)
-                y = dlogy.flatten() * y
-            elif deriv == 2:
+                logy, dlogy = self._eval_all(x, 1)
+                y = dlogy * np.exp(logy)
+            else:
                 # d^2(ρ(r)) = d^2(log(ρ(r))) * ρ(r) + [d(ρ(r))]^2/ρ(r)
-                dlogy = self._obj(x, nu=1)
-                d2logy = self._obj(x, nu=2)
-                y = d2logy.flatten() * y + dlogy.flatten() ** 2 * y
+                logy, dlogy, d2logy = self._eval_all(x, 2)
+                y = np.exp(logy)
+                y = d2logy * y + dlogy**2 * y
         else:
             y = self._obj(x, nu=deriv)
         return y
@@ -197,7 +274,7 @@ class JSONEncoder(json.JSONEncoder):
         if isinstance(obj, ndarray):
             return obj.tolist()
         else:
-            return JSONEncoder.default(self, obj)
+            return super().default(obj)
 
 
 class _AtomicOrbitals(object):
@@ -280,6 +357,9 @@ class Species:
         r"""Initialize a ``Species`` instance."""
         self._dataset = dataset.lower()
         self._data = SpeciesData(**fields)
+        self._charge = self._data.atnum - self._data.nelec
+        self._mult = self._data.nspin + 1
+        self._spline_cache = {}
         self.spinpol = spinpol
         self.ao = _AtomicOrbitals(self._data)
 
@@ -287,13 +367,31 @@ class Species:
         r"""Docstring of the species' dataset."""
         return import_module(f"atomdb.datasets.{self._dataset}").__doc__
 
+    def _as_dict(self):
+        r"""Return a shallow dictionary of the SpeciesData fields (arrays are not copied)."""
+        return {f.name: getattr(self._data, f.name) for f in fields(self._data)}
+
     def to_dict(self):
         r"""Return the dictionary representation of the Species instance."""
         return asdict(self._data)
 
     def to_json(self):
-        r"""Return the JSON string representation of the Species instance."""
-        return json.dumps(asdict(self._data), cls=JSONEncoder)
+        r"""Return the JSON string representation of the Species instance.
+
+        The string is encoded with orjson if it is installed, and with the standard library
+        otherwise. Both hold the same data, but orjson writes compact separators and encodes
+        NaN and infinities as ``null``, whereas the standard library writes them as the
+        non-standard ``NaN`` and ``Infinity`` tokens.
+
+        """
+        # orjson (if installed) serializes the arrays natively instead of through Python lists
+        if orjson is not None:
+            return orjson.dumps(
+                self._as_dict(),
+                default=JSONEncoder().default,
+                option=orjson.OPT_SERIALIZE_NUMPY,
+            ).decode()
+        return json.dumps(self._as_dict(), cls=JSONEncoder)
 
     @property
     def dataset(self):
@@ -303,17 +401,17 @@ class Species:
     @property
     def charge(self):
         r"""Charge."""
-        return self._data.atnum - self._data.nelec
+        return self._charge
 
     @property
     def nspin(self):
         r"""Spin number :math:`N_S = N_α - N_β`."""
-        return self._data.nspin * self._spinpol
+        return self._nspin
 
     @property
     def mult(self):
         r"""Multiplicity :math:`M = \left|N_S\right| + 1`."""
-        return self._data.nspin + 1
+        return self._mult
 
     @property
     def spinpol(self):
@@ -332,6 +430,9 @@ class Species:
             raise ValueError("`spinpol` must be +1 or -1")
 
         self._spinpol = spinpol
+        self._nspin = self._data.nspin * spinpol
+        # Cached splines depend on which spin channel is the majority one
+        self._spline_cache.clear()
 
     @scalar
     def elem(self):
@@ -553,6 +654,38 @@ def compile(
     dump(species, datapath=datapath)
 
 
+def compile_many(
+    specs,
+    dataset=DEFAULT_DATASET,
+    datapath=DEFAULT_DATAPATH,
+    max_workers=None,
+):
+    r"""Compile many atomic or ionic species into the AtomDB database in parallel.
+
+    Each worker process imports the dataset's compile script once and reuses it (and any grids or
+    basis data it sets up at import time) for all the species it is assigned.
+
+    Parameters
+    ----------
+    specs : iterable of tuple
+        ``(elem, charge, mult)`` or ``(elem, charge, mult, nexc)`` tuples, one per species.
+    dataset : str, optional
+        Dataset name, by default DEFAULT_DATASET.
+    datapath : str, optional
+        Path to the local AtomDB cache, by default DEFAULT_DATAPATH variable value.
+    max_workers : int, optional
+        Maximum number of worker processes, by default the number of processors.
+
+    """
+    specs = [(*spec, 0) if len(spec) == 3 else tuple(spec) for spec in specs]
+    if not specs:
+        return
+    elems, charges, mults, nexcs = zip(*specs)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        # Consume the results so that errors in the workers are raised here
+        list(executor.map(compile, elems, charges, mults, nexcs, repeat(dataset), repeat(datapath)))
+
+
 def dump(*species, datapath=DEFAULT_DATAPATH):
     r"""Dump the Species instance(s) to a MessagePack file in the database."""
     for s in species:
@@ -560,7 +693,7 @@ def dump(*species, datapath=DEFAULT_DATAPATH):
             s._data.elem, s.charge, s.mult, nexc=s.nexc, dataset=s.dataset, datapath=datapath
         )
         with open(fn, "wb") as f:
-            f.write(packb(asdict(s._data), default=encode))
+            f.write(packb(s._as_dict(), default=encode))
 
 
 def load(
@@ -583,17 +716,21 @@ def load(
         remotepath=remotepath,
     )
     if Ellipsis in (elem, charge, mult, nexc):
-        obj = []
-
-        for file in fn:
-            with open(file, "rb") as f:
-                obj.append(Species(dataset, unpackb(f.read(), object_hook=decode)))
+        # Overlap reading the files with unpacking them; map preserves the order of the files
+        with ThreadPoolExecutor() as executor:
+            obj = list(executor.map(_load_one, fn, repeat(dataset)))
     else:
-        with open(fn, "rb") as f:
-            obj = Species(dataset, unpackb(f.read(), object_hook=decode))
+        obj = _load_one(fn, dataset)
     return obj
 
 
+def _load_one(fn, dataset):
+    r"""Load a Species instance from a MessagePack database file."""
+    # Unpack straight from a read-only memory map of the file instead of a copy of its contents
+    with open(fn, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        return Species(dataset, unpackb(buf, object_hook=decode))
+
+
 def datafile(
     elem,
     charge,
@@ -24,6 +24,8 @@
 
 from importlib_resources import files
 
+import json
+
 import os
 
 import pytest
@@ -32,8 +34,12 @@ import numpy as np
 
 from scipy.interpolate import CubicSpline
 
+import atomdb.species
+
 from atomdb import load
 
+from atomdb.species import DensitySpline
+
 
 # get test data path
 TEST_DATAPATH = files("atomdb.test.data")
@@ -124,3 +130,164 @@ def test_dd_dens_func():
     test_dd_dens = spline_dd_dens_m(points)
 
     assert np.allclose(test_dd_dens, expected_dd_dens, rtol=1e-6)
+
+
+def test_spline_cache():
+    # Splines are built once per (property, spin, index, log) and reused afterwards.
+    sp = load("Be", 0, 1, dataset="gaussian", datapath=TEST_DATAPATH)
+
+    spline_dens = sp.dens_func(spin="a", index=[1, 2])
+    assert sp.dens_func(spin="a", index=[1, 2]) is spline_dens
+    assert sp.dens_func(spin="a", index=[1]) is not spline_dens
+    assert sp.ked_func(spin="a", index=[1, 2]) is not spline_dens
+
+    # Changing the spin polarization swaps the alpha and beta arrays, so the cache is reset.
+    # Use an open-shell species so that the alpha and beta densities differ.
+    sp = load("B", 0, 2, dataset="gaussian", datapath=TEST_DATAPATH)
+    points = np.linspace(0, 5, 20)
+    dens_a = sp.dens_func(spin="a")(points)
+    dens_b = sp.dens_func(spin="b")(points)
+    assert not np.allclose(dens_a, dens_b)
+
+    sp.spinpol = -1
+    assert np.allclose(sp.dens_func(spin="a")(points), dens_b)
+    assert np.allclose(sp.dens_func(spin="b")(points), dens_a)
+
+
+def test_spline_cache_index_types():
+    # Boolean masks and integer indices with equal values select different orbitals.
+    sp = load("Be", 0, 1, dataset="gaussian", datapath=TEST_DATAPATH)
+    points = np.linspace(0.1, 5, 20)
+    nbasis = sp.ao.nbasis
+
+    mask = [True] + [False] * (nbasis - 1)
+    ints = [1] + [0] * (nbasis - 1)
+    spline_mask = sp.dens_func(spin="a", index=mask)
+    spline_ints = sp.dens_func(spin="a", index=ints)
+    assert spline_ints is not spline_mask
+
+    fresh = load("Be", 0, 1, dataset="gaussian", datapath=TEST_DATAPATH)
+    assert np.allclose(spline_ints(points), fresh.dens_func(spin="a", index=ints)(points))
+    assert np.allclose(spline_mask(points), fresh.dens_func(spin="a", index=mask)(points))
+
+    # Slices are not hashable; they are evaluated without caching.
+    spline_slice = sp.dens_func(spin="a", index=slice(0, 2))
+    assert np.allclose(spline_slice(points), sp.dens_func(spin="a", index=[0, 1])(points))
+
+
+@pytest.mark.parametrize("encoder", ["orjson", "json"])
+def test_to_json(encoder, monkeypatch):
+    # The JSON representation holds the same data as the Species instance,
+    # whether it is encoded by orjson (if installed) or by the standard library.
+    if encoder == "orjson":
+        pytest.importorskip("orjson")
+    else:
+        monkeypatch.setattr(atomdb.species, "orjson", None)
+    sp = load("Be", 0, 1, dataset="gaussian", datapath=TEST_DATAPATH)
+    data = json.loads(sp.to_json())
+
+    assert data["elem"] == sp.elem
+    assert data["nelec"] == sp.nelec
+    assert np.allclose(data["rs"], sp._data.rs)
+    assert np.allclose(data["dens_tot"], sp._data.dens_tot)
+
+    # Non-finite values are encoded as null by orjson and as NaN by the standard library
+    sp._data.energy = np.nan
+    sp._data.rs = np.array([0.0, np.nan])
+    data = json.loads(sp.to_json())
+    if encoder == "orjson":
+        assert data["energy"] is None
+        assert data["rs"] == [0.0, None]
+    else:
+        assert np.isnan(data["energy"])
+        assert data["rs"][0] == 0.0 and np.isnan(data["rs"][1])
+
+
+def test_compile_many(monkeypatch):
+    # Each spec is compiled once, with nexc defaulting to 0 for 3-tuples. The workers are
+    # replaced by threads and `compile` by a recorder, so that no raw data is needed.
+    from concurrent.futures import ThreadPoolExecutor
+
+    calls = []
+    monkeypatch.setattr(atomdb.species, "ProcessPoolExecutor", ThreadPoolExecutor)
+    monkeypatch.setattr(atomdb.species, "compile", lambda *args: calls.append(args))
+    atomdb.species.compile_many(
+        [("Be", 0, 1), ["C", 1, 2, 1]], dataset="gaussian", datapath="path", max_workers=2
+    )
+    assert sorted(calls) == [
+        ("Be", 0, 1, 0, "gaussian", "path"),
+        ("C", 1, 2, 1, "gaussian", "path"),
+    ]
+
+    # An empty list returns without starting any worker
+    def no_executor(*args, **kwargs):
+        raise AssertionError("no worker should be started")
+
+    monkeypatch.setattr(atomdb.species, "ProcessPoolExecutor", no_executor)
+    assert atomdb.species.compile_many([]) is None
+
+
+def test_charge_nspin_mult():
+    # Charge and multiplicity are fixed; the sign of the spin number follows `spinpol`.
+    sp = load("H", -1, 1, dataset="numeric", datapath=TEST_DATAPATH)
+    assert sp.charge == -1
+    assert sp.mult == 1
+    assert sp.nspin == 0
+
+    sp = load("Cl", 0, 2, dataset="numeric", datapath=TEST_DATAPATH)
+    assert sp.charge == 0
+    assert sp.mult == 2
+    assert sp.nspin == 1
+    sp.spinpol = -1
+    assert sp.nspin == -1
+    assert sp.mult == 2
+
+
+@pytest.mark.parametrize("log", [False, True])
+def test_density_spline_float32(log):
+    # Density arrays stored in float32 are interpolated in float64.
+    sp = load("Be", 0, 1, dataset="gaussian", datapath=TEST_DATAPATH)
+    rs, dens = sp._data.rs, sp._data.dens_tot
+    points = np.linspace(0.1, 5, 20)
+
+    spline_64 = DensitySpline(rs, dens, log=log)
+    spline_32 = DensitySpline(rs, dens.astype(np.float32), log=log)
+    # Rounding of the stored values is amplified by each derivative order
+    for deriv, rtol in enumerate([1e-6, 1e-5, 1e-3]):
+        assert spline_32(points, deriv=deriv).dtype == np.float64
+        expected = spline_64(points, deriv=deriv)
+        assert np.allclose(spline_32(points, deriv=deriv), expected, rtol=rtol)
+
+
+@pytest.mark.parametrize(
+    "x",
+    [
+        np.linspace(0, 10, 50),  # evenly spaced in r
+        np.geomspace(1e-3, 20, 50),  # evenly spaced in log(r)
+        np.array([0.0, 0.3, 0.4, 1.1, 2.0, 2.2, 3.5, 5.0, 7.5, 10.0]),  # irregular
+        np.array([0.5, 1.5]),
+        np.array([0.5, 1.0, 2.5]),
+        np.array([0.5, 1.0, 2.5, 3.0]),
+    ],
+)
+def test_density_spline_cubic_spline(x):
+    # DensitySpline reproduces scipy's not-a-knot cubic spline, including extrapolation.
+    y = np.exp(-x) * (2 + np.sin(3 * x))
+    points = np.concatenate([np.linspace(-0.5, 12, 101), x])
+    spline = DensitySpline(x, y)
+    spline_ref = CubicSpline(x, y, bc_type="not-a-knot", extrapolate=True)
+    for deriv in range(3):
+        assert np.allclose(spline(points, deriv=deriv), spline_ref(points, nu=deriv), atol=1e-10)
+    # Non-finite queries give NaN, like CubicSpline
+    assert np.all(np.isnan(spline(np.array([np.nan, 1.0]))) == [True, False])
+
+    # The log branch evaluates log(ρ) and its derivatives together; check it against the chain
+    # rule applied to separate evaluations of the reference spline.
+    spline = DensitySpline(x, y, log=True)
+    spline_ref = CubicSpline(x, np.log(y), bc_type="not-a-knot", extrapolate=True)
+    logy, dlogy, d2logy = (spline_ref(points, nu=nu) for nu in range(3))
+    expected = [np.exp(logy), dlogy * np.exp(logy), (d2logy + dlogy**2) * np.exp(logy)]
+    for deriv in range(3):
+        assert np.allclose(spline(points, deriv=deriv), expected[deriv], rtol=1e-10, atol=0)
+    assert spline(1.0, deriv=2).shape == (1,)
+    assert np.all(np.isnan(spline(np.array([np.nan, 1.0]), deriv=2)) == [True, False])
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# AtomDB is an extended periodic table database containing experimental
+# and/or computational information on stable ground state
+# and/or excited states of neutral and charged atomic species.
+#
+# Copyright (C) 2014-2015 The AtomDB Development Team
+#
+# This file is part of AtomDB.
+#
+# AtomDB is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 3
+# of the License, or (at your option) any later version.
+#
+# AtomDB is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>
+#
+# --
+
+import pytest
+
+import numpy as np
+
+# The HCI compile script imports these packages at module level
+pytest.importorskip("gbasis")
+pytest.importorskip("grid")
+pytest.importorskip("iodata")
+
+from atomdb.datasets.hci_augccpwcvqz.run import (
+    contract_one_density_matrix,
+    natural_orbitals,
+)
+
+
+NBASIS = 30
+
+NPOINTS = 50
+
+
+def random_one_density_matrix(rank, seed=42):
+    r"""Return a random symmetric 1DM of the given rank and random orbital values."""
+    rng = np.random.default_rng(seed)
+    vecs = rng.standard_normal((NBASIS, rank))
+    orb_eval = rng.standard_normal((NBASIS, NPOINTS))
+    return vecs @ vecs.T / NBASIS, orb_eval
+
+
+@pytest.mark.parametrize("rank", [4, 10, 20])
+def test_natural_orbitals(rank):
+    # Only the non-zero occupations are kept, and they rebuild the 1DM
+    dm1, _ = random_one_density_matrix(rank)
+    occs, coeffs = natural_orbitals(dm1)
+    assert occs.shape == (rank,)
+    assert coeffs.shape == (NBASIS, rank)
+    assert np.allclose((coeffs * occs) @ coeffs.T, dm1)
+
+
+@pytest.mark.parametrize("rank", [4, 10, 20])
+def test_contract_one_density_matrix(rank):
+    # Both routes give the product of the 1DM with the orbital values
+    dm1, orb_eval = random_one_density_matrix(rank)
+    natorbs = natural_orbitals(dm1)
+    assert np.allclose(contract_one_density_matrix(dm1, orb_eval), dm1 @ orb_eval)
+    assert np.allclose(contract_one_density_matrix(dm1, orb_eval, natorbs), dm1 @ orb_eval)
+
+
+@pytest.mark.parametrize("rank, use_natorbs", [(4, True), (9, True), (10, False), (20, False)])
+def test_contract_one_density_matrix_switch(rank, use_natorbs):
+    # The natural orbitals are used only while 3 * K_no < K_orb; passing a zero 1DM alongside
+    # them tells the two routes apart
+    dm1, orb_eval = random_one_density_matrix(rank)
+    product = contract_one_density_matrix(np.zeros_like(dm1), orb_eval, natural_orbitals(dm1))
+    expected = dm1 @ orb_eval if use_natorbs else np.zeros_like(orb_eval)
+    assert np.allclose(product, expected)